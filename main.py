@@ -5,7 +5,7 @@ from colorama import init, Fore, Style
 
 from src.search import SearchEngine, load_documents
 from src.client import ChatClient
-from src.search.ui import interactive_chat, print_header
+from src.search.ui import interactive_chat, print_header, clear_screen
 
 
 init(autoreset=True)
@@ -50,7 +50,7 @@ def main():
     args = parse_args()
     
     # Clear screen and print header
-    os.system('cls' if os.name == 'nt' else 'clear')
+    clear_screen()
     print_header()
     
     search_engine = None
@@ -111,6 +111,8 @@ def main():
     except Exception as e:
         print(f"{Fore.RED}Error: {e}{Style.RESET_ALL}")
         return 1
+    finally:
+        chat_client.close()
     
     return 0
 
@@ -1,9 +1,10 @@
 from .client import ChatClient
-from .search.ui import interactive_chat, print_header, show_document_references
+from .search.ui import interactive_chat, print_header, show_document_references, clear_screen
 
 __all__ = [
     'ChatClient', 
     'interactive_chat', 
     'print_header',
-    'show_document_references'
+    'show_document_references',
+    'clear_screen'
 ] 
\ No newline at end of file
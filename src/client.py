@@ -1,6 +1,10 @@
+import codecs
 import json
 import requests
-from typing import List, Dict, Any, Optional, Callable
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import List, Dict, Any, Optional, Callable, Tuple
 from colorama import init, Fore, Style
 
 init(autoreset=True)
@@ -41,17 +45,47 @@ class ChatClient:
         self.conversation = []
         self.doc_references = []
         
+        # number of messages already written per json lines file, for append-only saves
+        self.saved_offsets = {}
+        
+        # document content per set of result ids, search results themselves are
+        # cached by the search engine which invalidates them on insert
+        self._cached_documents = lru_cache(maxsize=256)(self._fetch_documents)
+        
+        # persistent session reuses keep-alive connections across requests;
+        # only chat requests are retried, requests mounts the longest matching prefix
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._session.mount(f"{host}/api/chat", HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=16,
+            max_retries=Retry(total=2, backoff_factor=0.2)
+        ))
+        
         if not self._check_ollama_available():
             print(f"{Fore.MAGENTA}Warning: Cannot connect to Ollama at {host}{Style.RESET_ALL}")
     
     def _check_ollama_available(self) -> bool:
-        """verify connection to ollama api"""
+        """verify connection to ollama api, failing at once when it is not running"""
         try:
-            response = requests.get(f"{self.host}/api/tags")
+            response = self._session.get(f"{self.host}/api/tags")
             return response.status_code == 200
         except:
             return False
     
+    def _fetch_documents(self, doc_ids: Tuple[int, ...]) -> Dict[int, Tuple[str, Dict[str, Any]]]:
+        """fetch content and metadata of search results, cached per tuple of ids
+        
+        args:
+            doc_ids: document identifiers in ranked order
+            
+        returns:
+            dict mapping each document id to (content, metadata)
+        """
+        return self.search_engine.get_documents(doc_ids)
+    
     def _generate_response(self, prompt: str, stream_handler: Optional[Callable[[str], None]] = None) -> str:
         """generate response from model, with document context if available
         
@@ -68,11 +102,12 @@ class ChatClient:
             search_results = self.search_engine.search(prompt, self.k_search)
             
             if search_results:
+                documents = self._cached_documents(tuple(doc_id for doc_id, _, _ in search_results))
                 docs_content = []
                 self.doc_references = []
                 
                 for doc_id, metadata, _ in search_results:
-                    content, _ = self.search_engine.get_document(doc_id)
+                    content = documents[doc_id][0]
                     doc_source = metadata.get("source", "unknown")
                     
                     docs_content.append(f"[Document: {doc_source}]\n{content}\n")
@@ -97,23 +132,40 @@ class ChatClient:
             payload["system"] = self.system_prompt
         
         if stream_handler:
-            response_text = ""
-            response = requests.post(url, json=payload, stream=True)
+            response_parts = []
+            response = self._session.post(url, json=payload, stream=True)
+            
+            # decode ndjson frames straight from the byte stream, a frame split
+            # across network chunks stays in the buffer until it is complete
+            decoder = json.JSONDecoder()
+            utf8_decoder = codecs.getincrementaldecoder("utf-8")()
+            buffer = ""
             
-            for line in response.iter_lines():
-                if line:
+            for data in response.iter_content(chunk_size=4096):
+                buffer += utf8_decoder.decode(data)
+                
+                while True:
+                    buffer = buffer.lstrip()
                     try:
-                        chunk = json.loads(line)
-                        if "message" in chunk and "content" in chunk["message"]:
-                            content = chunk["message"]["content"]
-                            response_text += content
-                            stream_handler(content)
-                    except:
-                        pass
+                        chunk, end = decoder.raw_decode(buffer)
+                    except json.JSONDecodeError as e:
+                        # a malformed line is skipped once its newline arrived,
+                        # otherwise the frame is incomplete and waits for more data
+                        newline = buffer.find("\n", e.pos)
+                        if newline == -1:
+                            break
+                        buffer = buffer[newline + 1:]
+                        continue
+                    buffer = buffer[end:]
+                    
+                    if isinstance(chunk, dict) and "content" in chunk.get("message", {}):
+                        content = chunk["message"]["content"]
+                        response_parts.append(content)
+                        stream_handler(content)
             
-            return response_text
+            return "".join(response_parts)
         else:
-            response = requests.post(url, json=payload)
+            response = self._session.post(url, json=payload)
             
             if response.status_code == 200:
                 result = response.json()
@@ -148,7 +200,17 @@ class ChatClient:
         """get document references used in last response"""
         return self.doc_references
     
+    def get_cache_info(self):
+        """get hit and miss statistics of the document content cache"""
+        return self._cached_documents.cache_info()
+    
     def clear_conversation(self):
-        """reset conversation history and document references"""
+        """reset conversation history, document references and document content cache"""
         self.conversation = []
-        self.doc_references = [] 
\ No newline at end of file
+        self.doc_references = []
+        self.saved_offsets = {}
+        self._cached_documents.cache_clear()
+    
+    def close(self):
+        """close pooled http connections to ollama api"""
+        self._session.close()
@@ -1,67 +1,215 @@
 import re
 import sqlite3
 import json
-import uuid
-from typing import List, Dict, Any, Tuple
+import time
+from array import array
+from collections import OrderedDict, defaultdict
+from typing import List, Dict, Any, Tuple, Union
+
+
+# connection tuning applied at connect time: wal journal with relaxed sync,
+# in-memory temp storage, 64mb page cache and 256mb memory-mapped reads
+SQLITE_PRAGMAS = (
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "temp_store=MEMORY",
+    "cache_size=-65536",
+    "mmap_size=268435456",
+)
+
+# word runs of at least two characters, matching the minimum term length
+TOKEN_PATTERN = re.compile(r'\w{2,}')
+
+# "?,?,..." parameter lists keyed by arity, reused across queries
+_PLACEHOLDERS = {}
+
+# bounded lru of recent search results and how long an entry stays valid in seconds
+SEARCH_CACHE_SIZE = 256
+SEARCH_CACHE_TTL = 60.0
+
+# stored in PRAGMA user_version, bumped whenever the table layout changes
+SCHEMA_VERSION = 4
+
+
+def _placeholders(count: int) -> str:
+    """get comma separated sql placeholders for count parameters"""
+    if count not in _PLACEHOLDERS:
+        _PLACEHOLDERS[count] = ','.join(['?'] * count)
+    return _PLACEHOLDERS[count]
 
 
 class SearchEngine:
     """lightweight search engine using sqlite for document storage and retrieval"""
     
-    def __init__(self, db_path: str = ":memory:"):
+    def __init__(self, db_path: str = ":memory:", create_indices: bool = True):
         """initialize search engine with database connection
         
         args:
             db_path: path to sqlite database file or :memory: for in-memory db
+            create_indices: build search indices now; bulk loaders pass False
+                and call create_indices() once all documents are inserted
         """
-        self.conn = sqlite3.connect(db_path)
-        self.conn.enable_load_extension(True)
-        try:
-            self.conn.load_extension("fts5")
-            self.has_fts = True
-        except:
-            self.has_fts = False
-        self.conn.enable_load_extension(False)
+        # autocommit mode: writes open transactions explicitly, reads never do
+        self.conn = sqlite3.connect(
+            db_path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=256
+        )
+        for pragma in SQLITE_PRAGMAS:
+            self.conn.execute(f"PRAGMA {pragma}")
         
         self.cursor = self.conn.cursor()
-        self._create_tables()
+        self.has_fts = self._check_fts()
+        
+        # search results per (query terms, top_k) with their insertion time
+        self._search_cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        self._migrate_schema()
+        
+        if create_indices:
+            self.create_indices()
     
-    def _create_tables(self):
-        """create database tables and indices for documents and term index"""
+    def _check_fts(self) -> bool:
+        """check whether sqlite was built with the fts5 extension"""
+        try:
+            self.cursor.execute("CREATE VIRTUAL TABLE temp.fts_probe USING fts5(content)")
+            self.cursor.execute("DROP TABLE temp.fts_probe")
+            return True
+        except sqlite3.OperationalError:
+            return False
+    
+    def _migrate_schema(self):
+        """create base tables, rebuilding databases written by an older schema version
+        
+        documents stored by an older version are re-added so that every index
+        is rebuilt with the current layout
+        """
+        self.cursor.execute("PRAGMA user_version")
+        if self.cursor.fetchone()[0] == SCHEMA_VERSION:
+            self._create_base_tables()
+            return
+        
+        self.cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'documents'"
+        )
+        has_documents = self.cursor.fetchone() is not None
+        
+        self.cursor.execute("BEGIN")
+        self.cursor.execute("DROP TRIGGER IF EXISTS documents_ai")
+        self.cursor.execute("DROP TRIGGER IF EXISTS documents_ad")
+        self.cursor.execute("DROP TABLE IF EXISTS fts_documents")
+        self.cursor.execute("DROP TABLE IF EXISTS terms")
+        if has_documents:
+            self.cursor.execute("ALTER TABLE documents RENAME TO legacy_documents")
+        
+        self._create_base_tables()
+        
+        if has_documents:
+            legacy_rows = self.conn.execute("SELECT content, metadata FROM legacy_documents ORDER BY rowid")
+            for content, metadata_json in legacy_rows:
+                self.add_document(content, json.loads(metadata_json), commit=False)
+            self.cursor.execute("DROP TABLE legacy_documents")
+        
+        self.cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.commit()
+    
+    def _create_base_tables(self):
+        """create tables holding documents and fallback term data, without indices
+        
+        the terms table is only created as a fallback index for sqlite
+        builds without fts5; it has no constraints, _index_terms writes one
+        row per term and document and create_indices adds its only index
+        """
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS documents (
-                id TEXT PRIMARY KEY,
+                id INTEGER PRIMARY KEY,
                 content TEXT,
                 metadata TEXT
             )
         ''')
         
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS terms (
-                term TEXT,
-                doc_id TEXT,
-                frequency INTEGER,
-                positions TEXT,
-                UNIQUE(term, doc_id)
-            )
-        ''')
+        if not self.has_fts:
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS terms (
+                    term TEXT,
+                    doc_id INTEGER,
+                    frequency INTEGER,
+                    positions BLOB
+                )
+            ''')
+    
+    def create_indices(self, analyze: bool = False):
+        """create search indices over stored documents
         
-        self.cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_terms_term ON terms(term)
-        ''')
+        building indices after a bulk load is much cheaper than maintaining
+        them on every insert; documents inserted before the fts table existed
+        are indexed by a single rebuild
+        
+        args:
+            analyze: refresh planner statistics even if every index already
+                existed, bulk loaders pass True after inserting documents
+        """
+        self.commit()
         
         if self.has_fts:
-            try:
-                self.cursor.execute('''
-                    CREATE VIRTUAL TABLE IF NOT EXISTS fts_documents USING fts5(
-                        content,
-                        doc_id UNINDEXED
-                    )
-                ''')
-            except:
-                self.has_fts = False
+            self.cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'fts_documents'"
+            )
+            needs_build = self.cursor.fetchone() is None
+            
+            self.cursor.execute("BEGIN")
+            
+            # external content table: text is only stored once, in documents
+            self.cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS fts_documents USING fts5(
+                    content,
+                    content='documents',
+                    content_rowid='id',
+                    tokenize='porter unicode61',
+                    prefix='2 3 4'
+                )
+            ''')
+            
+            # keep the fts index in sync with documents
+            self.cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+                    INSERT INTO fts_documents (rowid, content) VALUES (new.id, new.content);
+                END
+            ''')
+            self.cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+                    INSERT INTO fts_documents (fts_documents, rowid, content)
+                    VALUES ('delete', old.id, old.content);
+                END
+            ''')
+            
+            if needs_build:
+                self.cursor.execute("INSERT INTO fts_documents (fts_documents) VALUES ('rebuild')")
+        else:
+            self.cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_terms_cover'"
+            )
+            needs_build = self.cursor.fetchone() is None
+            
+            self.cursor.execute("BEGIN")
+            
+            # covering index: term lookups are answered from index pages alone
+            self.cursor.execute("DROP INDEX IF EXISTS idx_terms_term")
+            self.cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_terms_cover ON terms(term, doc_id, frequency)
+            ''')
         
-        self.conn.commit()
+        self.commit()
+        
+        # a full ANALYZE only pays off once indices were built over new data,
+        # routine opens leave statistics to the much cheaper PRAGMA optimize
+        if analyze or needs_build:
+            self.analyze()
+        else:
+            self.cursor.execute("PRAGMA optimize")
     
     def _tokenize(self, text: str) -> List[str]:
         """extract meaningful terms from text for indexing or searching
@@ -72,60 +220,63 @@ class SearchEngine:
         returns:
             list of lowercase terms with length > 1
         """
-        text = text.lower()
-        terms = re.findall(r'\w+', text)
-        return [term for term in terms if len(term) > 1]
+        return TOKEN_PATTERN.findall(text.lower())
     
-    def add_document(self, content: str, metadata: Dict[str, Any]) -> str:
+    def add_document(self, content: str, metadata: Union[Dict[str, Any], str], commit: bool = True) -> int:
         """add document to database with content and metadata
         
         args:
             content: text content of document
-            metadata: additional information about document
+            metadata: additional information about document, or its json serialization
+            commit: commit immediately; bulk loaders pass False and commit in batches
             
         returns:
-            generated document id
+            integer document id assigned by sqlite
         """
-        doc_id = str(uuid.uuid4())
+        if not self.conn.in_transaction:
+            self.cursor.execute("BEGIN")
+        
+        self._search_cache.clear()
         
+        # fts_documents is filled by the documents_ai trigger once indices exist
         self.cursor.execute(
-            "INSERT INTO documents (id, content, metadata) VALUES (?, ?, ?)",
-            (doc_id, content, json.dumps(metadata))
+            "INSERT INTO documents (content, metadata) VALUES (?, ?)",
+            (content, metadata if isinstance(metadata, str) else json.dumps(metadata))
         )
+        doc_id = self.cursor.lastrowid
         
-        if self.has_fts:
-            try:
-                self.cursor.execute(
-                    "INSERT INTO fts_documents (doc_id, content) VALUES (?, ?)",
-                    (doc_id, content)
-                )
-            except:
-                self.has_fts = False
-        
-        terms = self._tokenize(content)
-        term_counts = {}
-        term_positions = {}
-        
-        # track term frequencies and positions
-        for pos, term in enumerate(terms):
-            term_counts[term] = term_counts.get(term, 0) + 1
-            if term not in term_positions:
-                term_positions[term] = []
-            term_positions[term].append(pos)
+        if not self.has_fts:
+            self._index_terms(doc_id, content)
         
-        # store term data in index
-        for term, count in term_counts.items():
-            positions = json.dumps(term_positions[term])
-            self.cursor.execute(
-                "INSERT INTO terms (term, doc_id, frequency, positions) VALUES (?, ?, ?, ?)",
-                (term, doc_id, count, positions)
-            )
-        
-        self.conn.commit()
+        if commit:
+            self.commit()
         return doc_id
     
-    def search(self, query: str, top_k: int = 5) -> List[Tuple[str, Dict[str, Any], float]]:
-        """search documents using multi-strategy approach
+    def _index_terms(self, doc_id: int, content: str):
+        """store term frequencies and positions of a document in the fallback index
+        
+        args:
+            doc_id: document identifier
+            content: text content of document
+        """
+        # track term positions, frequencies are the number of positions
+        term_positions = defaultdict(list)
+        for pos, term in enumerate(self._tokenize(content)):
+            term_positions[term].append(pos)
+        
+        # store term data in index with a single batched statement, positions
+        # packed as native uint32 values readable with array('I').frombytes
+        rows = [
+            (term, doc_id, len(positions), array('I', positions).tobytes())
+            for term, positions in term_positions.items()
+        ]
+        self.cursor.executemany(
+            "INSERT INTO terms (term, doc_id, frequency, positions) VALUES (?, ?, ?, ?)",
+            rows
+        )
+    
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[int, Dict[str, Any], float]]:
+        """search documents using fts5 ranking or the fallback term index
         
         args:
             query: search query text
@@ -139,82 +290,103 @@ class SearchEngine:
         if not query_terms:
             return []
         
+        # exact-match cache on normalized terms, invalidated by add_document
+        cache_key = (tuple(query_terms), top_k)
+        cached = self._search_cache.get(cache_key)
+        if cached is not None and time.monotonic() - cached[1] < SEARCH_CACHE_TTL:
+            self._search_cache.move_to_end(cache_key)
+            self.cache_hits += 1
+            return list(cached[0])
+        
+        self.cache_misses += 1
+        results = self._search_terms(query_terms, top_k)
+        
+        self._search_cache[cache_key] = (results, time.monotonic())
+        self._search_cache.move_to_end(cache_key)
+        if len(self._search_cache) > SEARCH_CACHE_SIZE:
+            self._search_cache.popitem(last=False)
+        
+        return list(results)
+    
+    def _search_terms(self, query_terms: List[str], top_k: int) -> List[Tuple[int, Dict[str, Any], float]]:
+        """run search for tokenized query terms against the database
+        
+        args:
+            query_terms: terms extracted from query text
+            top_k: maximum number of results to return
+            
+        returns:
+            list of tuples with (doc_id, metadata, score)
+        """
         results = []
         
-        # strategy 1: full-text search (fastest and most accurate)
+        # full-text search: bm25 ranking with prefix matching on every term,
+        # ranked inside the fts index so only the top_k rows touch documents
         if self.has_fts:
-            try:
-                fts_query = " OR ".join(query_terms)
-                self.cursor.execute("""
-                    SELECT d.id, d.metadata, fts.rank
-                    FROM fts_documents fts
-                    JOIN documents d ON fts.doc_id = d.id
-                    WHERE fts.content MATCH ?
-                    ORDER BY fts.rank
+            fts_query = " OR ".join(f'"{term}"*' for term in query_terms)
+            self.cursor.execute("""
+                SELECT d.id, d.metadata, ranked.score
+                FROM (
+                    SELECT rowid, bm25(fts_documents) AS score
+                    FROM fts_documents
+                    WHERE fts_documents MATCH ?
+                    ORDER BY score
                     LIMIT ?
-                """, (fts_query, top_k))
-                
-                for row in self.cursor.fetchall():
-                    doc_id, metadata_json, score = row
-                    metadata = json.loads(metadata_json)
-                    results.append((doc_id, metadata, score))
-                
-                if results:
-                    return results
-            except:
-                self.has_fts = False
-        
-        # strategy 2: term index search (more detailed matching)
-        if not results:
-            query_terms_set = set(query_terms)
-            if query_terms_set:
-                term_placeholders = ','.join(['?'] * len(query_terms_set))
-                
-                self.cursor.execute(f"""
-                    SELECT doc_id, term, frequency, positions
-                    FROM terms
-                    WHERE term IN ({term_placeholders})
-                """, list(query_terms_set))
-                
-                doc_matches = {}
-                for doc_id, term, freq, positions_json in self.cursor.fetchall():
-                    if doc_id not in doc_matches:
-                        doc_matches[doc_id] = {
-                            'term_matches': {},
-                            'total_matches': 0,
-                            'total_freq': 0
-                        }
-                    
-                    doc_matches[doc_id]['term_matches'][term] = {
-                        'freq': freq,
-                        'positions': json.loads(positions_json) if positions_json else []
-                    }
-                    doc_matches[doc_id]['total_matches'] += 1
-                    doc_matches[doc_id]['total_freq'] += freq
-                
-                # score documents based on term coverage and frequency
-                scored_docs = []
-                for doc_id, match_data in doc_matches.items():
-                    term_count_score = match_data['total_matches'] / len(query_terms_set)
-                    freq_score = match_data['total_freq']
-                    
-                    final_score = term_count_score * 3 + freq_score
-                    scored_docs.append((doc_id, final_score))
-                
-                if scored_docs:
-                    scored_docs.sort(key=lambda x: x[1], reverse=True)
-                    top_docs = scored_docs[:top_k]
-                    
-                    for doc_id, score in top_docs:
-                        self.cursor.execute(
-                            "SELECT metadata FROM documents WHERE id = ?",
-                            (doc_id,)
-                        )
-                        metadata_json = self.cursor.fetchone()[0]
-                        metadata = json.loads(metadata_json)
-                        results.append((doc_id, metadata, score))
-        
-        # strategy 3: fuzzy/prefix matching (fallback for inexact matches)
+                ) ranked
+                JOIN documents d ON d.id = ranked.rowid
+                ORDER BY ranked.score
+            """, (fts_query, top_k))
+            
+            for doc_id, metadata_json, score in self.cursor.fetchall():
+                results.append((doc_id, json.loads(metadata_json), score))
+            
+            return results
+        
+        # term index search (fallback for sqlite builds without fts5)
+        # dedupe while keeping query order
+        unique_terms = list(dict.fromkeys(query_terms))
+        
+        self.cursor.execute(f"""
+            SELECT doc_id, frequency
+            FROM terms
+            WHERE term IN ({_placeholders(len(unique_terms))})
+        """, unique_terms)
+        
+        # positions are not used for scoring, so they are never read here
+        doc_matches = {}
+        for doc_id, freq in self.cursor.fetchall():
+            if doc_id not in doc_matches:
+                doc_matches[doc_id] = {
+                    'total_matches': 0,
+                    'total_freq': 0
+                }
+            
+            doc_matches[doc_id]['total_matches'] += 1
+            doc_matches[doc_id]['total_freq'] += freq
+        
+        # score documents based on term coverage and frequency
+        scored_docs = []
+        for doc_id, match_data in doc_matches.items():
+            term_count_score = match_data['total_matches'] / len(unique_terms)
+            freq_score = match_data['total_freq']
+            
+            final_score = term_count_score * 3 + freq_score
+            scored_docs.append((doc_id, final_score))
+        
+        if scored_docs:
+            scored_docs.sort(key=lambda x: x[1], reverse=True)
+            top_docs = scored_docs[:top_k]
+            
+            for doc_id, score in top_docs:
+                self.cursor.execute(
+                    "SELECT metadata FROM documents WHERE id = ?",
+                    (doc_id,)
+                )
+                metadata_json = self.cursor.fetchone()[0]
+                metadata = json.loads(metadata_json)
+                results.append((doc_id, metadata, score))
+        
+        # fuzzy/prefix matching over the term index (fallback for inexact matches)
         if not results and query_terms:
             like_patterns = []
             like_params = []
@@ -248,7 +420,7 @@ class SearchEngine:
         
         return results
     
-    def get_document(self, doc_id: str) -> Tuple[str, Dict[str, Any]]:
+    def get_document(self, doc_id: int) -> Tuple[str, Dict[str, Any]]:
         """retrieve document content and metadata by id
         
         args:
@@ -264,13 +436,53 @@ class SearchEngine:
         content, metadata_json = self.cursor.fetchone()
         return content, json.loads(metadata_json)
     
+    def get_documents(self, doc_ids: List[int]) -> Dict[int, Tuple[str, Dict[str, Any]]]:
+        """retrieve content and metadata of several documents in one query
+        
+        args:
+            doc_ids: document identifiers
+            
+        returns:
+            dict mapping each found document id to (content, metadata)
+        """
+        if not doc_ids:
+            return {}
+        
+        self.cursor.execute(
+            f"SELECT id, content, metadata FROM documents WHERE id IN ({_placeholders(len(doc_ids))})",
+            list(doc_ids)
+        )
+        return {
+            doc_id: (content, json.loads(metadata_json))
+            for doc_id, content, metadata_json in self.cursor.fetchall()
+        }
+    
+    def get_cache_stats(self) -> Dict[str, int]:
+        """get hit, miss and size statistics of the search results cache"""
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "size": len(self._search_cache)
+        }
+    
     def get_document_count(self) -> int:
         """get total number of documents in database"""
         self.cursor.execute("SELECT COUNT(*) FROM documents")
         return self.cursor.fetchone()[0]
     
+    def analyze(self):
+        """refresh query planner statistics, typically after a bulk load"""
+        self.commit()
+        self.cursor.execute("ANALYZE")
+    
+    def commit(self):
+        """commit pending inserts to database"""
+        if self.conn.in_transaction:
+            self.cursor.execute("COMMIT")
+    
     def close(self):
-        """close database connection"""
+        """commit pending inserts and close database connection"""
+        self.commit()
         self.conn.close()
     
     def __del__(self):
@@ -1,11 +1,141 @@
 import os
 import glob
+import json
 import time
-from typing import Optional
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
 
 from .engine import SearchEngine
 
 
+# number of chunks inserted between two commits during bulk loading
+COMMIT_BATCH_SIZE = 500
+
+# files read ahead per worker process, bounds chunks waiting for the writer
+READ_AHEAD_PER_WORKER = 2
+
+# workers are started fresh instead of forked, so they never inherit the
+# parent's open sqlite connection
+WORKER_START_METHOD = "spawn"
+
+
+def chunk_text(text: str, size: int = 2000, overlap: int = 200) -> List[str]:
+    """split text into overlapping chunks with intelligent breaks
+    
+    args:
+        text: source text to split
+        size: maximum chunk size in characters
+        overlap: overlap between chunks in characters
+    
+    returns:
+        list of text chunks
+    """
+    if len(text) <= size:
+        return [text]
+    
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        
+        # try to break at paragraph boundary
+        if end < len(text):
+            paragraph_break = text.rfind('\n\n', start, end)
+            if paragraph_break > start + size // 2:
+                end = paragraph_break + 2
+        
+        # try to break at sentence boundary
+        if end < len(text) and end == start + size:
+            sentence_end = max(
+                text.rfind('. ', start, end),
+                text.rfind('! ', start, end),
+                text.rfind('? ', start, end)
+            )
+            if sentence_end > start + size // 2:
+                end = sentence_end + 2
+        
+        # fallback to word boundary
+        if end < len(text) and end == start + size:
+            space_pos = text.rfind(' ', start, end)
+            if space_pos > start:
+                end = space_pos + 1
+        
+        chunks.append(text[start:end])
+        
+        # last chunk reached end of text, stepping further would only
+        # emit ever shorter suffixes of it
+        if end == len(text):
+            break
+        
+        # ensure proper overlap between chunks
+        start = max(start + 1, end - overlap)
+        
+        # special case for small remaining content
+        if start > end - 50 and end < len(text):
+            start = end
+    
+    return chunks
+
+
+def _read_and_chunk(file_path: str, chunk_size: int) -> Tuple[Optional[List[str]], Optional[Exception]]:
+    """read a file and split it into chunks, run in worker processes
+    
+    args:
+        file_path: path of file to read
+        chunk_size: size of document chunks
+        
+    returns:
+        tuple of (chunks, error) where error is set if reading failed
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            return chunk_text(file.read(), chunk_size), None
+    except Exception as e:
+        return None, e
+
+
+def _iter_chunked_files(file_paths: List[str], chunk_size: int) -> Iterator[Tuple[str, Optional[List[str]], Optional[Exception]]]:
+    """read and chunk files in worker processes, yielding results in file order
+    
+    only a bounded window of files is in flight so finished chunks do not
+    pile up while the caller inserts them
+    
+    args:
+        file_paths: paths of files to read
+        chunk_size: size of document chunks
+        
+    returns:
+        generator of (file_path, chunks, error) tuples
+    """
+    # a single file is not worth starting worker processes for
+    if len(file_paths) <= 1:
+        for file_path in file_paths:
+            yield (file_path, *_read_and_chunk(file_path, chunk_size))
+        return
+    
+    workers = min(os.cpu_count() or 1, len(file_paths))
+    context = multiprocessing.get_context(WORKER_START_METHOD)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        pending = deque()
+        paths = iter(file_paths)
+        
+        for file_path in paths:
+            pending.append((file_path, executor.submit(_read_and_chunk, file_path, chunk_size)))
+            if len(pending) >= workers * READ_AHEAD_PER_WORKER:
+                break
+        
+        while pending:
+            file_path, future = pending.popleft()
+            
+            next_path = next(paths, None)
+            if next_path is not None:
+                pending.append((next_path, executor.submit(_read_and_chunk, next_path, chunk_size)))
+            
+            yield (file_path, *future.result())
+
+
 def load_documents(resources_dir: str, db_path: str = ":memory:", pattern: str = "**/*.llm", chunk_size: int = 2000) -> Optional[SearchEngine]:
     """load documents from files and create search engine index
     
@@ -31,89 +161,43 @@ def load_documents(resources_dir: str, db_path: str = ":memory:", pattern: str =
             data_dir = "data"
             os.makedirs(data_dir, exist_ok=True)
             db_path = os.path.join(data_dir, "ressources.db")
-            search_engine = SearchEngine(db_path)
-        else:
-            search_engine = SearchEngine(db_path)
+        
+        # indices are built in one pass once every document is stored
+        search_engine = SearchEngine(db_path, create_indices=False)
         
         file_paths = glob.glob(os.path.join(resources_dir, pattern), recursive=True)
         count = 0
         
-        def chunk_text(text, size=chunk_size, overlap=200):
-            """split text into overlapping chunks with intelligent breaks
-            
-            args:
-                text: source text to split
-                size: maximum chunk size in characters
-                overlap: overlap between chunks in characters
-                
-            returns:
-                list of text chunks
-            """
-            if len(text) <= size:
-                return [text]
+        # read and chunk files in worker processes, the sqlite connection stays
+        # owned by this process which adds every chunk to search engine
+        for file_path, chunks, error in _iter_chunked_files(file_paths, chunk_size):
+            if error is not None:
+                print(f"Error loading {file_path}: {error}")
+                continue
             
-            chunks = []
-            start = 0
-            while start < len(text):
-                end = min(start + size, len(text))
-                
-                # try to break at paragraph boundary
-                if end < len(text):
-                    paragraph_break = text.rfind('\n\n', start, end)
-                    if paragraph_break > start + size // 2:
-                        end = paragraph_break + 2
-                
-                # try to break at sentence boundary
-                if end < len(text) and end == start + size:
-                    sentence_end = max(
-                        text.rfind('. ', start, end),
-                        text.rfind('! ', start, end),
-                        text.rfind('? ', start, end)
-                    )
-                    if sentence_end > start + size // 2:
-                        end = sentence_end + 2
-                
-                # fallback to word boundary
-                if end < len(text) and end == start + size:
-                    space_pos = text.rfind(' ', start, end)
-                    if space_pos > start:
-                        end = space_pos + 1
-                
-                chunks.append(text[start:end])
-                
-                # ensure proper overlap between chunks
-                start = max(start + 1, end - overlap)
-                
-                # special case for small remaining content
-                if start > end - 50 and end < len(text):
-                    start = end
-            
-            return chunks
-        
-        # process each file and add to search engine
-        for file_path in file_paths:
             try:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    content = file.read()
-                
-                chunks = chunk_text(content)
+                # serialize file-level metadata once, leaving the object open for chunk fields
+                file_metadata = json.dumps({
+                    "source": file_path,
+                    "filename": os.path.basename(file_path),
+                    "extension": os.path.splitext(file_path)[1],
+                    "directory": os.path.dirname(file_path)
+                })[:-1]
                 
                 for i, chunk in enumerate(chunks):
-                    metadata = {
-                        "source": file_path,
-                        "filename": os.path.basename(file_path),
-                        "extension": os.path.splitext(file_path)[1],
-                        "directory": os.path.dirname(file_path),
-                        "chunk": i,
-                        "total_chunks": len(chunks)
-                    }
+                    metadata = f'{file_metadata}, "chunk": {i}, "total_chunks": {len(chunks)}}}'
                     
-                    search_engine.add_document(chunk, metadata)
+                    search_engine.add_document(chunk, metadata, commit=False)
                     count += 1
                     
+                    if count % COMMIT_BATCH_SIZE == 0:
+                        search_engine.commit()
+                    
             except Exception as e:
                 print(f"Error loading {file_path}: {e}")
         
+        search_engine.create_indices(analyze=True)
+        
         elapsed_time = time.time() - start_time
         print(f"Loaded {count} document chunks in {elapsed_time:.2f} seconds.")
         
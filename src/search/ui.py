@@ -1,11 +1,48 @@
 import os
-import json
+import sys
 import time
+from functools import lru_cache
 from colorama import Fore, Style
 
 from src.client import ChatClient
 
 
+# streamed response text is written out once this many characters are buffered,
+# on a newline, or when this many seconds passed since the last write
+STREAM_BUFFER_SIZE = 4096
+STREAM_FLUSH_INTERVAL = 0.05
+
+# erase display and move cursor home, written directly instead of spawning `clear`
+CLEAR_SEQUENCE = "\x1b[2J\x1b[H"
+IS_WINDOWS = os.name == 'nt'
+
+
+class _NoColor:
+    """stand-in for colorama Fore and Style whose attributes are empty strings"""
+    
+    def __getattr__(self, name):
+        return ""
+
+
+# piped or redirected output gets plain text without escape sequences
+if not sys.stdout.isatty():
+    Fore = Style = _NoColor()
+
+
+def clear_screen():
+    """clear terminal screen, leaving piped output untouched"""
+    if not sys.stdout.isatty():
+        return
+    
+    if IS_WINDOWS:
+        # legacy windows consoles may not interpret ansi sequences
+        import subprocess
+        subprocess.run("cls", shell=True, check=False)
+    else:
+        sys.stdout.write(CLEAR_SEQUENCE)
+        sys.stdout.flush()
+
+
 def print_header():
     """display application header with formatting"""
     header = """
@@ -44,16 +81,15 @@ def interactive_chat(
     save_commands = save_commands or ["/save", "save"]
     load_commands = load_commands or ["/load", "load"]
     
-    os.system('cls' if os.name == 'nt' else 'clear')
+    clear_screen()
     print_header()
     
     print(f"{Style.BRIGHT}Interactive chat session using {Fore.YELLOW}{chat_client.model}{Style.RESET_ALL}")
     print(f"Type {Fore.YELLOW}{', '.join(exit_commands)}{Style.RESET_ALL} to exit")
     print(f"Type {Fore.YELLOW}{', '.join(help_commands)}{Style.RESET_ALL} for help")
     
-    def show_help():
-        """display available commands and their descriptions"""
-        help_text = f"""
+    # command lists are fixed for the session, so help is formatted only once
+    help_text = f"""
 {Fore.MAGENTA}{Style.BRIGHT}Available Commands:{Style.RESET_ALL}
   {Fore.YELLOW}{', '.join(exit_commands)}{Style.RESET_ALL} - Exit the interactive session
   {Fore.YELLOW}{', '.join(help_commands)}{Style.RESET_ALL} - Show this help message
@@ -61,45 +97,105 @@ def interactive_chat(
   {Fore.YELLOW}{', '.join(docs_commands)}{Style.RESET_ALL} - Show document references for the last response
   {Fore.YELLOW}{', '.join(save_commands)} [filename]{Style.RESET_ALL} - Save conversation to a file
   {Fore.YELLOW}{', '.join(load_commands)} [filename]{Style.RESET_ALL} - Load conversation from a file
+
 """
-        print(help_text)
+    
+    def show_help():
+        """display available commands and their descriptions"""
+        sys.stdout.write(help_text)
+    
+    stream_buffer = []
+    buffered_size = 0
+    last_flush = time.monotonic()
+    
+    def flush_stream():
+        """write buffered response text to stdout in a single call"""
+        nonlocal buffered_size, last_flush
+        if stream_buffer:
+            sys.stdout.write(Fore.WHITE + "".join(stream_buffer))
+            sys.stdout.flush()
+            stream_buffer.clear()
+        buffered_size = 0
+        last_flush = time.monotonic()
     
     def print_stream(text):
-        """print streaming response text"""
-        print(f"{Fore.WHITE}{text}", end="")
+        """buffer streaming response text, flushing by size, line or elapsed time"""
+        nonlocal buffered_size
+        stream_buffer.append(text)
+        buffered_size += len(text)
+        if (buffered_size >= STREAM_BUFFER_SIZE or "\n" in text
+                or time.monotonic() - last_flush >= STREAM_FLUSH_INTERVAL):
+            flush_stream()
+    
+    def exit_session(args):
+        """leave the interactive session"""
+        print(f"{Fore.YELLOW}Exiting interactive session.{Style.RESET_ALL}")
+        return True
+    
+    def clear_session(args):
+        """clear conversation history and screen"""
+        chat_client.clear_conversation()
+        clear_screen()
+        print_header()
+        print(f"{Fore.YELLOW}Conversation history cleared.{Style.RESET_ALL}")
+    
+    # dispatch on the first word of input: command -> (handler, accepts arguments);
+    # commands without arguments only match on their own, otherwise input goes to the model
+    command_table = {}
+    for commands, handler, accepts_args in (
+        (exit_commands, exit_session, False),
+        (help_commands, lambda args: show_help(), False),
+        (clear_commands, clear_session, False),
+        (docs_commands, lambda args: show_document_references(chat_client), True),
+        (save_commands, lambda args: save_conversation(chat_client, args), True),
+        (load_commands, lambda args: load_conversation(chat_client, args), True)
+    ):
+        for command in commands:
+            command_table.setdefault(command.casefold(), (handler, accepts_args))
+    
+    # formatted once per session rather than on every turn
+    prompt = f"\n{Fore.MAGENTA}{Style.BRIGHT}You > {Style.RESET_ALL}"
+    model_prefix = f"\n{Fore.YELLOW}{Style.BRIGHT}MODEL > {Style.RESET_ALL}"
+    docs_hint = f"\n{Style.DIM}(Type {Fore.YELLOW}/docs{Style.RESET_ALL}{Style.DIM} to see document references){Style.RESET_ALL}"
+    
+    def read_inputs():
+        """yield user inputs, reading piped stdin directly instead of through input()"""
+        if sys.stdin.isatty():
+            # input() keeps readline editing and history for interactive use
+            while True:
+                try:
+                    yield input(prompt)
+                except EOFError:
+                    return
+        else:
+            for line in sys.stdin:
+                sys.stdout.write(prompt)
+                yield line.rstrip("\n")
+    
+    inputs = read_inputs()
     
     while True:
         try:
-            user_input = input(f"\n{Fore.MAGENTA}{Style.BRIGHT}You > {Style.RESET_ALL}")
+            user_input = next(inputs, None)
             
-            if user_input.lower() in exit_commands:
-                print(f"{Fore.YELLOW}Exiting interactive session.{Style.RESET_ALL}")
+            if user_input is None:
+                print(f"\n{Fore.YELLOW}Exiting interactive session.{Style.RESET_ALL}")
                 break
             
-            elif user_input.lower() in help_commands:
-                show_help()
+            command, _, args = user_input.strip().partition(" ")
+            entry = command_table.get(command.casefold())
             
-            elif user_input.lower() in clear_commands:
-                chat_client.clear_conversation()
-                os.system('cls' if os.name == 'nt' else 'clear')
-                print_header()
-                print(f"{Fore.YELLOW}Conversation history cleared.{Style.RESET_ALL}")
-            
-            elif user_input.lower() in docs_commands or user_input.lower().startswith(tuple(d + " " for d in docs_commands)):
-                show_document_references(chat_client)
-            
-            elif user_input.lower() in save_commands or user_input.lower().startswith(tuple(s + " " for s in save_commands)):
-                save_conversation(chat_client, user_input)
-            
-            elif user_input.lower() in load_commands or user_input.lower().startswith(tuple(l + " " for l in load_commands)):
-                load_conversation(chat_client, user_input)
+            if entry and (entry[1] or not args):
+                if entry[0](args.strip()):
+                    break
             
             else:
-                print(f"\n{Fore.YELLOW}{Style.BRIGHT}MODEL > {Style.RESET_ALL}", end="")
+                print(model_prefix, end="")
                 response = chat_client.ask(user_input, print_stream)
+                flush_stream()
                 
                 if chat_client.doc_references:
-                    print(f"\n{Style.DIM}(Type {Fore.YELLOW}/docs{Style.RESET_ALL}{Style.DIM} to see document references){Style.RESET_ALL}")
+                    print(docs_hint)
         
         except KeyboardInterrupt:
             print(f"\n{Fore.YELLOW}Exiting interactive session.{Style.RESET_ALL}")
@@ -120,57 +216,150 @@ def show_document_references(chat_client):
     if not doc_refs:
         print(f"{Fore.YELLOW}No document references available for the last response.{Style.RESET_ALL}")
     else:
-        print(f"\n{Fore.MAGENTA}{Style.BRIGHT}Document references:{Style.RESET_ALL}")
+        # build the whole listing first so it is written in a single call
+        lines = [f"\n{Fore.MAGENTA}{Style.BRIGHT}Document references:{Style.RESET_ALL}\n"]
         for i, doc in enumerate(doc_refs):
             source = doc.get("source", "Unknown")
             chunk = doc.get("chunk", 0)
             total_chunks = doc.get("total_chunks", 1)
-            print(f"  {Fore.WHITE}[{i+1}] {Fore.YELLOW}{source} {Style.DIM}(chunk {chunk+1}/{total_chunks}){Style.RESET_ALL}")
+            lines.append(f"  {Fore.WHITE}[{i+1}] {Fore.YELLOW}{source} {Style.DIM}(chunk {chunk+1}/{total_chunks}){Style.RESET_ALL}\n")
+        sys.stdout.write("".join(lines))
+
+
+@lru_cache(maxsize=None)
+def _orjson():
+    """import orjson on first use, None when it is not installed"""
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+@lru_cache(maxsize=None)
+def _ijson():
+    """import ijson on first use, None when it is not installed"""
+    try:
+        import ijson
+    except ImportError:
+        return None
+    return ijson
+
+
+def _dump_json(obj, indent=False):
+    """serialize object to utf-8 json bytes, using orjson when installed
+    
+    args:
+        obj: object to serialize
+        indent: indent output with two spaces instead of compact separators
+        
+    returns:
+        encoded json bytes
+    """
+    orjson = _orjson()
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    
+    import json
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _load_json(data):
+    """parse json bytes, using orjson when installed"""
+    orjson = _orjson()
+    if orjson is not None:
+        return orjson.loads(data)
+    
+    import json
+    return json.loads(data)
+
+
+def _is_json_array_file(filename):
+    """check whether a conversation file holds a single json array, which is
+    the case for .json names; every other name holds json lines
+    """
+    return filename.endswith(".json")
 
 
-def save_conversation(chat_client, command_input):
-    """save conversation history to json file
+def save_conversation(chat_client, filename=None):
+    """save conversation history to json lines file, or a json array for .json names
+    
+    output is compact unless the name ends in .pretty.json, which is indented for reading
     
     args:
         chat_client: chat client with conversation to save
-        command_input: command string that may include filename
+        filename: target file, defaults to a timestamped name
     """
-    parts = command_input.split(" ", 1)
-    filename = parts[1] if len(parts) > 1 else f"chat_{int(time.time())}.json"
+    filename = filename or f"chat_{int(time.time())}.jsonl"
     
     try:
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(chat_client.conversation, f, ensure_ascii=False, indent=2)
+        if _is_json_array_file(filename):
+            with open(filename, "wb") as f:
+                f.write(_dump_json(chat_client.conversation, indent=filename.endswith(".pretty.json")))
+        else:
+            _save_jsonl(chat_client, filename)
         
         print(f"{Fore.MAGENTA}Conversation saved to {Fore.YELLOW}{filename}{Style.RESET_ALL}")
     except Exception as e:
         print(f"{Fore.RED}Error saving conversation: {e}{Style.RESET_ALL}")
 
 
-def load_conversation(chat_client, command_input):
-    """load conversation history from json file
+def _save_jsonl(chat_client, filename):
+    """write one json object per message, appending only messages added since
+    the last save to the same file
     
     args:
-        chat_client: chat client to load conversation into
-        command_input: command string that may include filename
+        chat_client: chat client with conversation to save
+        filename: target file
     """
-    parts = command_input.split(" ", 1)
+    path = os.path.abspath(filename)
+    
+    # the offset is only restored once the write succeeds, so a file not written
+    # during this conversation or left partial by a failed save is rewritten from scratch
+    saved_count = chat_client.saved_offsets.pop(path, None)
+    with open(filename, "ab" if saved_count is not None else "wb") as f:
+        for message in chat_client.conversation[saved_count or 0:]:
+            f.write(_dump_json(message) + b"\n")
+    
+    chat_client.saved_offsets[path] = len(chat_client.conversation)
+
+
+def load_conversation(chat_client, filename=None):
+    """load conversation history from json lines file, or a json array for .json names
     
-    if len(parts) < 2:
+    args:
+        chat_client: chat client to load conversation into
+        filename: file to load conversation from
+    """
+    if not filename:
         print(f"{Fore.RED}Please specify a filename to load.{Style.RESET_ALL}")
         return
     
-    filename = parts[1]
-    
     if not os.path.exists(filename):
         print(f"{Fore.RED}File not found: {filename}{Style.RESET_ALL}")
         return
     
     try:
-        with open(filename, "r", encoding="utf-8") as f:
-            conversation = json.load(f)
+        with open(filename, "rb") as f:
+            if _is_json_array_file(filename):
+                # ijson parses one message at a time instead of holding the raw file text
+                ijson = _ijson()
+                if ijson is not None:
+                    conversation = list(ijson.items(f, "item", use_float=True))
+                else:
+                    conversation = _load_json(f.read())
+            else:
+                conversation = [_load_json(line) for line in f if line.strip()]
         
         chat_client.conversation = conversation
+        
+        # later saves to a loaded json lines file only append new messages
+        chat_client.saved_offsets = {}
+        if not _is_json_array_file(filename):
+            chat_client.saved_offsets[os.path.abspath(filename)] = len(conversation)
+        
         print(f"{Fore.MAGENTA}Conversation loaded from {Fore.YELLOW}{filename}{Style.RESET_ALL}")
     except Exception as e:
-        print(f"{Fore.RED}Error loading conversation: {e}{Style.RESET_ALL}") 
\ No newline at end of file
+        print(f"{Fore.RED}Error loading conversation: {e}{Style.RESET_ALL}")